@@ -4,13 +4,12 @@ use std::sync::{Arc, Mutex};
 use std::thread;
 use std::io::Write;
 use tauri::AppHandle;
-use regex::Regex;
 
 use crate::models::{ProcessingState, ProcessingRequest};
-use crate::processing::{process_queue_item, run_pipeline};
+use crate::processing::{process_queue_item, run_pipeline, PipelineSlots};
 use crate::utils::{
     emit_log, emit_status, compute_output_for_batch, compute_output_for_single,
-    find_matching_dv_file
+    find_matching_dv_file, hdr_file_base, index_dv_files_by_base, list_file_names
 };
 
 #[tauri::command]
@@ -114,6 +113,7 @@ pub async fn start_processing(
             };
             let dv_delay_ms = request.dv_delay_ms;
             let hdr10plus_delay_ms = request.hdr10plus_delay_ms;
+            let slots = Arc::new(PipelineSlots::new(request.parallel_tasks));
 
             for item in request.queue.iter().cloned() {
                 let app_handle = app_handle.clone();
@@ -124,6 +124,7 @@ pub async fn start_processing(
                 let hdr10plus_path = hdr10plus_path.clone();
                 let dv_delay_ms = dv_delay_ms;
                 let hdr10plus_delay_ms = hdr10plus_delay_ms;
+                let slots = Arc::clone(&slots);
 
                 let handle = thread::spawn(move || {
                     let result = process_queue_item(
@@ -135,6 +136,7 @@ pub async fn start_processing(
                         dv_delay_ms,
                         hdr10plus_delay_ms,
                         keep_temp,
+                        slots,
                     );
 
                     if let Err(err) = result {
@@ -163,20 +165,9 @@ pub async fn start_processing(
             } else {
                 Some(PathBuf::from(&request.hdr10plus_path))
             };
-            let mut hdr_files = fs::read_dir(&request.hdr_path)
-                .map_err(|e| e.to_string())?
-                .filter_map(|entry| entry.ok())
-                .filter_map(|entry| entry.file_name().into_string().ok())
-                .collect::<Vec<String>>();
-
-            let mut dv_files = fs::read_dir(&request.dv_path)
-                .map_err(|e| e.to_string())?
-                .filter_map(|entry| entry.ok())
-                .filter_map(|entry| entry.file_name().into_string().ok())
-                .collect::<Vec<String>>();
-
-            hdr_files.sort();
-            dv_files.sort();
+            let hdr_files = list_file_names(Path::new(&request.hdr_path))?;
+            let dv_files = list_file_names(Path::new(&request.dv_path))?;
+            let dv_by_base = index_dv_files_by_base(&app_handle, &dv_files);
             let output_base = if request.output_path.is_empty() {
                 tool_paths.default_output.clone()
             } else {
@@ -184,14 +175,12 @@ pub async fn start_processing(
             };
 
             for (index, hdr_file) in hdr_files.iter().enumerate() {
-                let base_regex = Regex::new(r"(.*)\.(HDR)+.*")
-                    .map_err(|e| e.to_string())?;
-                let base = base_regex
-                    .captures(hdr_file)
-                    .and_then(|c| c.get(1).map(|m| m.as_str()))
-                    .unwrap_or_else(|| hdr_file.split('.').next().unwrap_or(hdr_file));
+                let base = hdr_file_base(hdr_file);
 
-                let dv_file = find_matching_dv_file(&dv_files, base)
+                let dv_file = dv_by_base
+                    .get(base)
+                    .map(|name| name.to_string())
+                    .or_else(|| find_matching_dv_file(&dv_files, base))
                     .or_else(|| dv_files.get(index).cloned())
                     .ok_or_else(|| format!("No DV file available for {}", hdr_file))?;
 
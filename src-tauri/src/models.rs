@@ -38,6 +38,8 @@ pub struct QueueContext {
     pub active_workers: Option<Arc<Mutex<usize>>>,
     pub file_id: Option<String>,
     pub file_name: Option<String>,
+    /// Per-step percentages for this file; `None` until the step starts.
+    pub step_progress: Arc<Mutex<Vec<Option<u8>>>>,
 }
 
 #[derive(Debug, Deserialize)]
@@ -1,10 +1,13 @@
+use std::collections::HashMap;
 use std::fs;
 use std::ffi::OsStr;
+use std::io::{BufReader, Read};
 use std::path::{Path, PathBuf};
-use std::process::{Command, Stdio};
-use std::sync::{Arc, Mutex};
+use std::process::{ChildStdout, Command, Stdio};
+use std::sync::atomic::{AtomicBool, AtomicU8, Ordering};
+use std::sync::{Arc, Condvar, Mutex, OnceLock};
 use std::thread;
-use std::time::Duration;
+use std::time::{Duration, Instant, SystemTime};
 use tauri::AppHandle;
 use regex::Regex;
 use serde_json::{json, Value};
@@ -28,9 +31,12 @@ use crate::models::{
 use crate::utils::{
     emit_log, emit_step, emit_queue, emit_file, resolve_path,
     compute_output_for_single, compute_output_for_batch, normalize_output_path,
-    find_matching_dv_file, get_video_metadata
+    find_matching_dv_file, get_video_metadata, hdr_file_base, index_dv_files_by_base,
+    list_file_names
 };
 
+const STEP_ABORTED: &str = "Step aborted";
+
 const STEP_NAMES: [&str; 6] = [
     "Extract Audio & Subtitles",
     "Extract DV Video",
@@ -45,6 +51,9 @@ struct VideoInfo {
     width: u32,
     height: u32,
     fps: f64,
+    /// Exact container frame rate as (numerator, denominator) when MediaInfo
+    /// reports one; never taken from the `FrameRate_Original_*` fields.
+    frame_rate: Option<(u64, u64)>,
     track_id: Option<u32>,
     language: Option<String>,
     format: Option<String>,
@@ -93,6 +102,12 @@ fn parse_f64_from_value(value: &Value) -> Option<f64> {
     None
 }
 
+fn frame_rate_ratio(track: &Value, num_key: &str, den_key: &str) -> Option<(f64, f64)> {
+    let num = track.get(num_key).and_then(parse_f64_from_value)?;
+    let den = track.get(den_key).and_then(parse_f64_from_value)?;
+    Some((num, den))
+}
+
 fn get_video_track(json: &Value) -> Option<&Value> {
     json.get("media")?
         .get("track")?
@@ -108,10 +123,71 @@ fn get_video_track(json: &Value) -> Option<&Value> {
         })
 }
 
+const MEDIAINFO_CACHE_CAPACITY: usize = 64;
+
+type MediaInfoKey = (PathBuf, SystemTime, u64);
+
+fn mediainfo_cache() -> &'static Mutex<HashMap<MediaInfoKey, VideoInfo>> {
+    static CACHE: OnceLock<Mutex<HashMap<MediaInfoKey, VideoInfo>>> = OnceLock::new();
+    CACHE.get_or_init(|| Mutex::new(HashMap::new()))
+}
+
+fn mediainfo_cache_key(file_path: &Path) -> Option<MediaInfoKey> {
+    let metadata = fs::metadata(file_path).ok()?;
+    let modified = metadata.modified().ok()?;
+    let path = fs::canonicalize(file_path).unwrap_or_else(|_| file_path.to_path_buf());
+    Some((path, modified, metadata.len()))
+}
+
+/// Probe a file with MediaInfo, reusing earlier results for unchanged files.
+///
+/// Results are keyed by canonical path, modification time and size, so the
+/// same source probed by several pipeline steps or queue items only spawns
+/// MediaInfo once.
 fn get_mediainfo(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String> {
+    let key = mediainfo_cache_key(file_path);
+    if let Some(key) = &key {
+        if let Ok(cache) = mediainfo_cache().lock() {
+            if let Some(info) = cache.get(key) {
+                return Ok(info.clone());
+            }
+        }
+    }
+
+    let info = probe_mediainfo(tool_path, file_path)?;
+
+    if let Some(key) = key {
+        if let Ok(mut cache) = mediainfo_cache().lock() {
+            if cache.len() >= MEDIAINFO_CACHE_CAPACITY {
+                cache.clear();
+            }
+            cache.insert(key, info.clone());
+        }
+    }
+
+    Ok(info)
+}
+
+/// Video track fields requested from MediaInfo, in template order.
+const MEDIAINFO_VIDEO_FIELDS: [&str; 11] = [
+    "Width",
+    "Height",
+    "FrameRate_Original_Num",
+    "FrameRate_Original_Den",
+    "FrameRate_Num",
+    "FrameRate_Den",
+    "FrameRate_Original",
+    "FrameRate",
+    "ID",
+    "Format",
+    "Language",
+];
+
+const MEDIAINFO_FIELD_SEPARATOR: char = '|';
+
+fn run_mediainfo(tool_path: &Path, args: &[&str], file_path: &Path) -> Result<Vec<u8>, String> {
     let output = Command::new(tool_path)
-        .arg("--Output=JSON")
-        .arg("-f")
+        .args(args)
         .arg(file_path)
         .output()
         .map_err(|e| format!("Failed to run MediaInfo: {}", e))?;
@@ -134,11 +210,56 @@ fn get_mediainfo(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String
         ));
     }
 
-    let json: Value = serde_json::from_slice(&output.stdout)
+    Ok(output.stdout)
+}
+
+/// Probe the first video track, asking MediaInfo only for the fields we use.
+///
+/// Falls back to the full (`-f`) JSON report if the template output is unusable
+/// (e.g. an older MediaInfo build that ignores the template).
+fn probe_mediainfo(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String> {
+    probe_mediainfo_template(tool_path, file_path)
+        .or_else(|_| probe_mediainfo_json(tool_path, file_path))
+}
+
+fn probe_mediainfo_template(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String> {
+    let separator = MEDIAINFO_FIELD_SEPARATOR.to_string();
+    let template = MEDIAINFO_VIDEO_FIELDS
+        .iter()
+        .map(|field| format!("%{}%", field))
+        .collect::<Vec<_>>()
+        .join(&separator);
+    let output_arg = format!("--Output=Video;{}\\n", template);
+    let stdout = run_mediainfo(tool_path, &[output_arg.as_str()], file_path)?;
+
+    let text = String::from_utf8_lossy(&stdout);
+    let line = text
+        .lines()
+        .map(str::trim)
+        .find(|line| !line.is_empty())
+        .ok_or("No video track found in MediaInfo output")?;
+
+    let track: serde_json::Map<String, Value> = MEDIAINFO_VIDEO_FIELDS
+        .iter()
+        .zip(line.split(MEDIAINFO_FIELD_SEPARATOR))
+        .filter(|(_, value)| !value.trim().is_empty())
+        .map(|(field, value)| (field.to_string(), Value::String(value.trim().to_string())))
+        .collect();
+
+    video_info_from_track(&Value::Object(track))
+}
+
+fn probe_mediainfo_json(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String> {
+    let stdout = run_mediainfo(tool_path, &["--Output=JSON", "-f"], file_path)?;
+
+    let json: Value = serde_json::from_slice(&stdout)
         .map_err(|e| format!("Failed to parse MediaInfo JSON: {}", e))?;
 
     let track = get_video_track(&json).ok_or("No video track found in MediaInfo output")?;
+    video_info_from_track(track)
+}
 
+fn video_info_from_track(track: &Value) -> Result<VideoInfo, String> {
     let width = track
         .get("Width")
         .and_then(parse_u32_from_value)
@@ -148,18 +269,12 @@ fn get_mediainfo(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String
         .and_then(parse_u32_from_value)
         .ok_or("MediaInfo height missing")?;
 
-    let fps = track
-        .get("FrameRate_Original_Num")
-        .and_then(parse_f64_from_value)
-        .zip(track.get("FrameRate_Original_Den").and_then(parse_f64_from_value))
+    let container_ratio = frame_rate_ratio(track, "FrameRate_Num", "FrameRate_Den");
+    let fps_ratio = frame_rate_ratio(track, "FrameRate_Original_Num", "FrameRate_Original_Den")
+        .or(container_ratio);
+
+    let fps = fps_ratio
         .map(|(num, den)| num / den)
-        .or_else(|| {
-            track
-                .get("FrameRate_Num")
-                .and_then(parse_f64_from_value)
-                .zip(track.get("FrameRate_Den").and_then(parse_f64_from_value))
-                .map(|(num, den)| num / den)
-        })
         .or_else(|| {
             track
                 .get("FrameRate_Original")
@@ -168,6 +283,12 @@ fn get_mediainfo(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String
         .or_else(|| track.get("FrameRate").and_then(parse_f64_from_value))
         .ok_or("MediaInfo frame rate missing")?;
 
+    // The mux default duration must match the container rate (what mkvmerge
+    // reports), not the stream's own `_Original` rate used for comparison.
+    let frame_rate = container_ratio
+        .filter(|(num, den)| *num > 0.0 && *den > 0.0 && num.fract() == 0.0 && den.fract() == 0.0)
+        .map(|(num, den)| (num as u64, den as u64));
+
     let track_id = track
         .get("ID")
         .and_then(parse_u32_from_value)
@@ -188,33 +309,68 @@ fn get_mediainfo(tool_path: &Path, file_path: &Path) -> Result<VideoInfo, String
         width,
         height,
         fps,
+        frame_rate,
         track_id,
         language,
         format,
     })
 }
 
-fn is_mp4_container(path: &Path) -> bool {
-    path.extension()
-        .and_then(OsStr::to_str)
-        .map(|ext| matches!(ext.to_ascii_lowercase().as_str(), "mp4" | "mov" | "m4v"))
-        .unwrap_or(false)
+const HEVC_EXTENSIONS: [&str; 2] = ["hevc", "h265"];
+const MP4_EXTENSIONS: [&str; 3] = ["mp4", "mov", "m4v"];
+
+/// Input container, decided once per file from its extension.
+#[derive(Clone, Copy, PartialEq, Eq)]
+enum Container {
+    RawHevc,
+    Mp4,
+    Other,
 }
 
-fn is_hevc_file(path: &Path) -> bool {
-    path.extension()
-        .and_then(OsStr::to_str)
-        .map(|ext| matches!(ext.to_ascii_lowercase().as_str(), "hevc" | "h265"))
-        .unwrap_or(false)
+fn classify_container(path: &Path) -> Container {
+    let Some(ext) = path.extension().and_then(OsStr::to_str) else {
+        return Container::Other;
+    };
+    if HEVC_EXTENSIONS.iter().any(|known| ext.eq_ignore_ascii_case(known)) {
+        Container::RawHevc
+    } else if MP4_EXTENSIONS.iter().any(|known| ext.eq_ignore_ascii_case(known)) {
+        Container::Mp4
+    } else {
+        Container::Other
+    }
 }
 
 fn is_hevc_format(info: &VideoInfo) -> bool {
     info.format
         .as_ref()
-        .map(|fmt| fmt.to_ascii_lowercase().contains("hevc") || fmt.to_ascii_lowercase().contains("h.265"))
+        .map(|fmt| {
+            let fmt = fmt.to_ascii_lowercase();
+            fmt.contains("hevc") || fmt.contains("h.265")
+        })
         .unwrap_or(false)
 }
 
+fn is_same_file(a: &Path, b: &Path) -> bool {
+    match (fs::canonicalize(a), fs::canonicalize(b)) {
+        (Ok(a), Ok(b)) => a == b,
+        _ => false,
+    }
+}
+
+fn remove_temp_files(app: &AppHandle, files: &[PathBuf]) {
+    for file in files {
+        match fs::remove_file(file) {
+            Ok(()) => {}
+            Err(err) if err.kind() == std::io::ErrorKind::NotFound => {}
+            Err(err) => emit_log(
+                app,
+                "warning",
+                format!("Could not remove {}: {}", file.display(), err),
+            ),
+        }
+    }
+}
+
 fn delay_to_frames(delay_ms: f64, fps: f64) -> u32 {
     ((delay_ms.abs() * fps) / 1000.0).round() as u32
 }
@@ -223,10 +379,11 @@ fn build_demux_command(
     mkvextract: &Path,
     mp4box: &Path,
     input: &Path,
+    container: Container,
     output: &Path,
     track_id: Option<u32>,
 ) -> Result<Command, String> {
-    if is_mp4_container(input) {
+    if container == Container::Mp4 {
         let id = track_id.ok_or("Missing track ID for MP4Box demux")?;
         let mut cmd = Command::new(mp4box);
         cmd.arg("-raw")
@@ -242,19 +399,60 @@ fn build_demux_command(
     Ok(cmd)
 }
 
-fn noop_command() -> Command {
-    if cfg!(target_os = "windows") {
-        let mut cmd = Command::new("cmd");
-        cmd.args(["/C", "exit", "0"]);
-        cmd
-    } else {
-        Command::new("true")
+/// How often a running step checks whether its tool has exited.
+const EXIT_POLL_INTERVAL: Duration = Duration::from_millis(50);
+
+/// How often a running step samples and reports progress.
+const PROGRESS_POLL_INTERVAL: Duration = Duration::from_millis(500);
+
+/// Sentinel stored in the shared progress cell until the tool reports a value.
+const NO_REPORTED_PROGRESS: u8 = u8::MAX;
+
+fn percent_regex() -> &'static Regex {
+    static PERCENT_RE: OnceLock<Regex> = OnceLock::new();
+    PERCENT_RE.get_or_init(|| {
+        Regex::new(r"^(?:Progress:|#GUI#progress)\s*(\d+)%").expect("valid percent regex")
+    })
+}
+
+fn record_reported_progress(line: &[u8], progress: &AtomicU8) {
+    let line = String::from_utf8_lossy(line);
+    // Only dedicated progress lines count; other output may echo file
+    // paths that happen to contain "NN%".
+    let percent = percent_regex()
+        .captures(line.trim())
+        .and_then(|c| c.get(1))
+        .and_then(|m| m.as_str().parse::<u32>().ok());
+    if let Some(percent) = percent {
+        progress.store(percent.min(100) as u8, Ordering::Relaxed);
     }
 }
 
+/// Read a tool's stdout and keep the latest progress percentage it printed.
+///
+/// mkvmerge and mkvextract print "Progress: NN%" lines, separated by either
+/// `\r` or `\n` depending on the build, so both count as line breaks.
+fn spawn_progress_reader(stdout: ChildStdout, progress: Arc<AtomicU8>) {
+    thread::spawn(move || {
+        let mut line = Vec::new();
+        for byte in BufReader::new(stdout).bytes() {
+            let Ok(byte) = byte else {
+                break;
+            };
+            if byte == b'\n' || byte == b'\r' {
+                record_reported_progress(&line, &progress);
+                line.clear();
+            } else {
+                line.push(byte);
+            }
+        }
+        record_reported_progress(&line, &progress);
+    });
+}
+
 fn run_command(
     state: &ProcessingState,
-    mut command: Command,
+    command: Option<Command>,
     app: &AppHandle,
     step_id: usize,
     step_name: &str,
@@ -264,6 +462,7 @@ fn run_command(
     step_index: usize,
     total_steps: usize,
     queue_ctx: Option<&QueueContext>,
+    stop_flag: Option<&AtomicBool>,
 ) -> Result<(), String> {
     if *state.cancel_flag.lock().map_err(|_| "State lock failed")? {
         return Err("Processing cancelled".to_string());
@@ -274,9 +473,28 @@ fn run_command(
 
     let emit_queue_progress = |progress: u8| {
         if let Some(ctx) = queue_ctx {
-            let file_progress = ((step_index as f64 + progress as f64 / 100.0)
-                / total_steps as f64)
-                * 100.0;
+            // Steps can run concurrently, so derive file progress from every
+            // step's percentage rather than from this step's index alone.
+            // Each step only ever moves forward, which keeps the total monotonic.
+            let (file_progress, active_steps) = match ctx.step_progress.lock() {
+                Ok(mut steps) => {
+                    if let Some(slot) = steps.get_mut(step_index) {
+                        *slot = Some(slot.unwrap_or(0).max(progress));
+                    }
+                    let sum: u32 = steps.iter().map(|p| p.unwrap_or(0) as u32).sum();
+                    let active = steps
+                        .iter()
+                        .enumerate()
+                        .filter(|(_, p)| matches!(p, Some(v) if *v < 100))
+                        .filter_map(|(i, _)| STEP_NAMES.get(i).copied())
+                        .collect::<Vec<&str>>();
+                    (sum as f64 / total_steps as f64, active)
+                }
+                Err(_) => (
+                    ((step_index as f64 + progress as f64 / 100.0) / total_steps as f64) * 100.0,
+                    Vec::new(),
+                ),
+            };
 
             let overall_progress = if let Some(tracker) = &ctx.tracker {
                 if let Ok(mut guard) = tracker.lock() {
@@ -292,9 +510,14 @@ fn run_command(
                 file_progress.round() as u8
             };
 
+            let step_names = if active_steps.is_empty() {
+                step_name.to_string()
+            } else {
+                active_steps.join(" + ")
+            };
             let step_label = match &ctx.label {
-                Some(label) => format!("{} - {}", label, step_name),
-                None => step_name.to_string(),
+                Some(label) => format!("{} - {}", label, step_names),
+                None => step_names,
             };
 
             emit_queue(
@@ -326,14 +549,32 @@ fn run_command(
         }
     };
 
+    // Register the step as started so concurrent siblings list it as active.
+    emit_queue_progress(0);
+
+    // Steps whose input is already in the right form have nothing to run.
+    let Some(mut command) = command else {
+        emit_step(app, step_id, step_name, "completed", 100);
+        emit_queue_progress(100);
+        emit_log(app, "success", format!("Step skipped: {}", step_name));
+        return Ok(());
+    };
+
     hide_console_window(&mut command);
     let mut child = command
-        .stdout(Stdio::null())
+        .stdout(if emit_progress { Stdio::piped() } else { Stdio::null() })
         .stderr(Stdio::null())
         .spawn()
         .map_err(|e| e.to_string())?;
 
+    let reported_progress = Arc::new(AtomicU8::new(NO_REPORTED_PROGRESS));
+    if let Some(stdout) = child.stdout.take() {
+        spawn_progress_reader(stdout, Arc::clone(&reported_progress));
+    }
+
     let input_size = fs::metadata(input_path).map(|m| m.len()).unwrap_or(1);
+    let mut last_percent = None;
+    let mut next_progress_poll = Instant::now();
 
     let result = loop {
         if *state.cancel_flag.lock().map_err(|_| "State lock failed")? {
@@ -341,13 +582,32 @@ fn run_command(
             return Err("Processing cancelled".to_string());
         }
 
-        if emit_progress {
-            if let Ok(metadata) = fs::metadata(output_path) {
-                let percent = ((metadata.len() as f64 / input_size as f64) * 100.0)
-                    .min(95.0)
-                    .max(0.0) as u8;
+        if stop_flag.map(|flag| flag.load(Ordering::SeqCst)).unwrap_or(false) {
+            let _ = child.kill();
+            let _ = child.wait();
+            emit_step(app, step_id, step_name, "pending", 0);
+            return Err(STEP_ABORTED.to_string());
+        }
+
+        if emit_progress && Instant::now() >= next_progress_poll {
+            next_progress_poll = Instant::now() + PROGRESS_POLL_INTERVAL;
+            // Prefer the tool's own progress; fall back to comparing output
+            // and input sizes for tools that stay silent when piped.
+            let reported = reported_progress.load(Ordering::Relaxed);
+            let percent = if reported != NO_REPORTED_PROGRESS {
+                Some(reported.min(99))
+            } else {
+                fs::metadata(output_path).ok().map(|metadata| {
+                    ((metadata.len() as f64 / input_size as f64) * 100.0)
+                        .min(95.0)
+                        .max(0.0) as u8
+                })
+            };
+            // Only push an update to the UI when the value actually moved.
+            if let Some(percent) = percent.filter(|p| Some(*p) != last_percent) {
                 emit_step(app, step_id, step_name, "active", percent);
                 emit_queue_progress(percent);
+                last_percent = Some(percent);
             }
         }
 
@@ -366,7 +626,9 @@ fn run_command(
                 }
             }
             Ok(None) => {
-                thread::sleep(Duration::from_millis(500));
+                // Poll for exit more often than for progress so a finished
+                // tool is noticed promptly instead of after a full interval.
+                thread::sleep(EXIT_POLL_INTERVAL);
             }
             Err(err) => {
                 emit_step(app, step_id, step_name, "error", 0);
@@ -378,14 +640,49 @@ fn run_command(
     result
 }
 
+/// Run two independent pipeline steps concurrently and wait for both.
+///
+/// The second step runs on the calling thread. Both steps share a stop flag
+/// that is raised as soon as either fails, so the sibling is killed instead
+/// of running to completion. The first real error is returned.
+fn run_concurrent_steps<A, B>(first: A, second: B) -> Result<(), String>
+where
+    A: FnOnce(&AtomicBool) -> Result<(), String> + Send,
+    B: FnOnce(&AtomicBool) -> Result<(), String>,
+{
+    let stop_flag = AtomicBool::new(false);
+    let stop_flag = &stop_flag;
+    thread::scope(|scope| {
+        let first_handle = scope.spawn(move || {
+            let result = first(stop_flag);
+            if result.is_err() {
+                stop_flag.store(true, Ordering::SeqCst);
+            }
+            result
+        });
+        let second_result = second(stop_flag);
+        if second_result.is_err() {
+            stop_flag.store(true, Ordering::SeqCst);
+        }
+        let first_result = first_handle
+            .join()
+            .unwrap_or_else(|_| Err("Processing step panicked".to_string()));
+
+        match (first_result, second_result) {
+            (Err(err), Err(other)) if err == STEP_ABORTED => Err(other),
+            (Err(err), _) => Err(err),
+            (Ok(()), result) => result,
+        }
+    })
+}
+
 /// Execute the processing pipeline for a single file pair.
 ///
 /// This function coordinates the extraction, processing, and merging steps:
-/// 1. Extract audio/subs
-/// 2. Extract DV video and RPU
-/// 3. Extract HDR10 video
-/// 4. Inject RPU into HDR10
-/// 5. Mux final output
+/// 1. Extract audio/subs and DV video (concurrently)
+/// 2. Extract RPU and HDR10 video (concurrently)
+/// 3. Inject RPU into HDR10
+/// 4. Mux final output
 pub fn run_pipeline(
     app: &AppHandle,
     state: &ProcessingState,
@@ -418,13 +715,7 @@ pub fn run_pipeline(
     let hdr10_hevc = PathBuf::from(format!("{}_hdr10.hevc", output_base));
     let dv_hdr = PathBuf::from(format!("{}_dv_hdr.hevc", output_base));
     let rpu_bin = PathBuf::from(format!("{}_rpu.bin", output_base));
-    let mut temp_files = vec![
-        audio_loc.clone(),
-        dv_hevc.clone(),
-        hdr10_hevc.clone(),
-        dv_hdr.clone(),
-        rpu_bin.clone(),
-    ];
+    let mut temp_files = vec![audio_loc.clone(), dv_hdr.clone(), rpu_bin.clone()];
 
     if let Some(parent) = output_path.parent() {
         if !parent.exists() {
@@ -432,8 +723,18 @@ pub fn run_pipeline(
         }
     }
 
-    // Detect Source Headers / FPS
-    let detected_duration = match get_video_metadata(&mkvmerge, input_hdr) {
+    emit_log(app, "info", format!("Processing: {}", output_path.display()));
+
+    let hdr_info = get_mediainfo(&mediainfo, input_hdr)?;
+    let dv_info = get_mediainfo(&mediainfo, input_dv)?;
+
+    // Detect Source Headers / FPS. MediaInfo usually reports the exact rate,
+    // which saves a second probe of the HDR source with mkvmerge.
+    let detected_duration = match hdr_info.frame_rate {
+        Some((num, den)) => Ok(format!("{}/{}p", num, den)),
+        None => get_video_metadata(&mkvmerge, input_hdr),
+    };
+    let detected_duration = match detected_duration {
         Ok(d) => {
             emit_log(app, "info", format!("Detected video duration/fps: {}", d));
             Some(d)
@@ -444,11 +745,6 @@ pub fn run_pipeline(
         }
     };
 
-    emit_log(app, "info", format!("Processing: {}", output_path.display()));
-
-    let hdr_info = get_mediainfo(&mediainfo, input_hdr)?;
-    let dv_info = get_mediainfo(&mediainfo, input_dv)?;
-
     if (hdr_info.fps - dv_info.fps).abs() > 0.001 {
         return Err(format!(
             "Frame rate mismatch - DV: {:.3} | HDR: {:.3}",
@@ -511,6 +807,7 @@ pub fn run_pipeline(
         active_workers: queue_active_workers,
         file_id: Some(format!("{}:{}", id, queue_file_index)),
         file_name: queue_file_name.map(|name| name.to_string()),
+        step_progress: Arc::new(Mutex::new(vec![None; STEP_NAMES.len()])),
     });
 
     if let Some(ctx) = &queue_ctx {
@@ -546,7 +843,8 @@ pub fn run_pipeline(
     let mut dv_extract_cmd = None;
     let mut dv_extract_output = dv_hevc.clone();
     let mut dv_hevc_path = dv_hevc.clone();
-    if is_hevc_file(input_dv) && is_hevc_format(&dv_info) {
+    let dv_container = classify_container(input_dv);
+    if dv_container == Container::RawHevc && is_hevc_format(&dv_info) {
         dv_hevc_path = input_dv.to_path_buf();
         dv_extract_output = input_dv.to_path_buf();
     } else {
@@ -554,15 +852,23 @@ pub fn run_pipeline(
             &mkvextract,
             &mp4box,
             input_dv,
+            dv_container,
             &dv_hevc,
             dv_info.track_id,
         )?);
+        temp_files.push(dv_hevc.clone());
     }
 
     let mut hdr_extract_cmd = None;
     let mut hdr_extract_output = hdr10_hevc.clone();
     let mut hdr_hevc_path = hdr10_hevc.clone();
-    if is_hevc_file(input_hdr) && is_hevc_format(&hdr_info) {
+    let hdr_container = classify_container(input_hdr);
+    if is_same_file(input_hdr, input_dv) {
+        // Same source for both layers: step 2 already demuxes this stream.
+        emit_log(app, "info", "HDR and DV inputs are the same file; reusing the DV stream.");
+        hdr_hevc_path = dv_hevc_path.clone();
+        hdr_extract_output = dv_extract_output.clone();
+    } else if hdr_container == Container::RawHevc && is_hevc_format(&hdr_info) {
         hdr_hevc_path = input_hdr.to_path_buf();
         hdr_extract_output = input_hdr.to_path_buf();
     } else {
@@ -570,9 +876,11 @@ pub fn run_pipeline(
             &mkvextract,
             &mp4box,
             input_hdr,
+            hdr_container,
             &hdr10_hevc,
             hdr_info.track_id,
         )?);
+        temp_files.push(hdr10_hevc.clone());
     }
 
     let mut cmd0 = Command::new(&mkvmerge);
@@ -583,7 +891,6 @@ pub fn run_pipeline(
         .arg(input_hdr);
 
     let dv_emit_progress = dv_extract_cmd.is_some();
-    let cmd1 = dv_extract_cmd.unwrap_or_else(noop_command);
 
     let mut cmd2 = Command::new(&dovi_tool);
     cmd2
@@ -595,48 +902,79 @@ pub fn run_pipeline(
         .arg(&rpu_bin);
 
     let hdr_emit_progress = hdr_extract_cmd.is_some();
-    let cmd3 = hdr_extract_cmd.unwrap_or_else(noop_command);
 
-    run_command(
-        state,
-        cmd0,
-        app,
-        1,
-        STEP_NAMES[0],
-        input_hdr,
-        &audio_loc,
-        true,
-        0,
-        STEP_NAMES.len(),
-        queue_ctx.as_ref(),
-    )?;
+    let queue_ctx_ref = queue_ctx.as_ref();
 
-    run_command(
-        state,
-        cmd1,
-        app,
-        2,
-        STEP_NAMES[1],
-        input_dv,
-        &dv_extract_output,
-        dv_emit_progress,
-        1,
-        STEP_NAMES.len(),
-        queue_ctx.as_ref(),
+    // Audio/subs and DV demux read different sources, so run them side by side.
+    run_concurrent_steps(
+        |stop| {
+            run_command(
+                state,
+                Some(cmd0),
+                app,
+                1,
+                STEP_NAMES[0],
+                input_hdr,
+                &audio_loc,
+                true,
+                0,
+                STEP_NAMES.len(),
+                queue_ctx_ref,
+                Some(stop),
+            )
+        },
+        |stop| {
+            run_command(
+                state,
+                dv_extract_cmd,
+                app,
+                2,
+                STEP_NAMES[1],
+                input_dv,
+                &dv_extract_output,
+                dv_emit_progress,
+                1,
+                STEP_NAMES.len(),
+                queue_ctx_ref,
+                Some(stop),
+            )
+        },
     )?;
 
-    run_command(
-        state,
-        cmd2,
-        app,
-        3,
-        STEP_NAMES[2],
-        &dv_hevc_path,
-        &rpu_bin,
-        false,
-        2,
-        STEP_NAMES.len(),
-        queue_ctx.as_ref(),
+    // RPU extraction only needs the DV stream, so overlap it with the HDR10 demux.
+    run_concurrent_steps(
+        |stop| {
+            run_command(
+                state,
+                Some(cmd2),
+                app,
+                3,
+                STEP_NAMES[2],
+                &dv_hevc_path,
+                &rpu_bin,
+                false,
+                2,
+                STEP_NAMES.len(),
+                queue_ctx_ref,
+                Some(stop),
+            )
+        },
+        |stop| {
+            run_command(
+                state,
+                hdr_extract_cmd,
+                app,
+                4,
+                STEP_NAMES[3],
+                input_hdr,
+                &hdr_extract_output,
+                hdr_emit_progress,
+                3,
+                STEP_NAMES.len(),
+                queue_ctx_ref,
+                Some(stop),
+            )
+        },
     )?;
 
     let mut rpu_path = rpu_bin.clone();
@@ -663,7 +1001,7 @@ pub fn run_pipeline(
             }]
         });
 
-        fs::write(&rpu_json_path, serde_json::to_vec_pretty(&rpu_json).map_err(|e| e.to_string())?)
+        fs::write(&rpu_json_path, serde_json::to_vec(&rpu_json).map_err(|e| e.to_string())?)
             .map_err(|e| e.to_string())?;
 
         emit_log(app, "info", "Editing RPU metadata...");
@@ -687,33 +1025,24 @@ pub fn run_pipeline(
         temp_files.push(rpu_edited);
     }
 
-    run_command(
-        state,
-        cmd3,
-        app,
-        4,
-        STEP_NAMES[3],
-        input_hdr,
-        &hdr_extract_output,
-        hdr_emit_progress,
-        3,
-        STEP_NAMES.len(),
-        queue_ctx.as_ref(),
-    )?;
-
     let mut hdr10_for_dv = hdr_hevc_path.clone();
     if let Some(hdr10plus_source) = hdr10plus_path {
         if !hdr10plus_source.as_os_str().is_empty() {
             emit_log(app, "info", "Extracting HDR10+ metadata...");
             let hdr10plus_info = get_mediainfo(&mediainfo, hdr10plus_source)?;
             let mut hdr10plus_hevc_path = hdr10plus_source.to_path_buf();
+            let hdr10plus_container = classify_container(hdr10plus_source);
 
-            if !(is_hevc_file(hdr10plus_source) && is_hevc_format(&hdr10plus_info)) {
+            if is_same_file(hdr10plus_source, input_hdr) {
+                // The HDR10 stream was already demuxed in step 4; reuse it.
+                hdr10plus_hevc_path = hdr_hevc_path.clone();
+            } else if !(hdr10plus_container == Container::RawHevc && is_hevc_format(&hdr10plus_info)) {
                 let hdr10plus_demux = PathBuf::from(format!("{}_hdr10plus.hevc", output_base));
                 let mut demux_cmd = build_demux_command(
                     &mkvextract,
                     &mp4box,
                     hdr10plus_source,
+                    hdr10plus_container,
                     &hdr10plus_demux,
                     hdr10plus_info.track_id,
                 )?;
@@ -764,7 +1093,7 @@ pub fn run_pipeline(
                             "length": hdr10plus_duplicate_length
                         }]
                     });
-                    fs::write(&hdr10plus_edits, serde_json::to_vec_pretty(&edits_json).map_err(|e| e.to_string())?)
+                    fs::write(&hdr10plus_edits, serde_json::to_vec(&edits_json).map_err(|e| e.to_string())?)
                         .map_err(|e| e.to_string())?;
 
                     emit_log(app, "info", "Editing HDR10+ metadata...");
@@ -821,7 +1150,7 @@ pub fn run_pipeline(
 
     run_command(
         state,
-        cmd4,
+        Some(cmd4),
         app,
         5,
         STEP_NAMES[4],
@@ -831,8 +1160,20 @@ pub fn run_pipeline(
         4,
         STEP_NAMES.len(),
         queue_ctx.as_ref(),
+        None,
     )?;
 
+    // Only the injected stream and the audio/subs are needed for muxing.
+    // Dropping the other full-size intermediates now keeps peak disk usage
+    // to roughly one extra copy of the video during the mux.
+    if !keep_temp {
+        let (still_needed, spent): (Vec<PathBuf>, Vec<PathBuf>) = temp_files
+            .into_iter()
+            .partition(|file| *file == dv_hdr || *file == audio_loc);
+        remove_temp_files(app, &spent);
+        temp_files = still_needed;
+    }
+
     let mut cmd5 = Command::new(&mkvmerge);
     cmd5
         .arg("--ui-language")
@@ -851,7 +1192,7 @@ pub fn run_pipeline(
 
     run_command(
         state,
-        cmd5,
+        Some(cmd5),
         app,
         6,
         STEP_NAMES[5],
@@ -861,12 +1202,11 @@ pub fn run_pipeline(
         5,
         STEP_NAMES.len(),
         queue_ctx.as_ref(),
+        None,
     )?;
 
     if !keep_temp {
-        for file in temp_files.iter() {
-            let _ = fs::remove_file(file);
-        }
+        remove_temp_files(app, &temp_files);
         emit_log(app, "info", "Temporary files cleaned up.");
     }
 
@@ -887,6 +1227,55 @@ pub fn run_pipeline(
     Ok(())
 }
 
+/// Counting semaphore that bounds how many pipelines run at once.
+///
+/// A single instance is shared by every queue item in a batch so the
+/// "Parallel Processes" setting applies across items and folder contents.
+pub struct PipelineSlots {
+    capacity: usize,
+    available: Mutex<usize>,
+    released: Condvar,
+}
+
+impl PipelineSlots {
+    pub fn new(capacity: usize) -> Self {
+        let capacity = capacity.max(1);
+        Self {
+            capacity,
+            available: Mutex::new(capacity),
+            released: Condvar::new(),
+        }
+    }
+
+    pub fn capacity(&self) -> usize {
+        self.capacity
+    }
+
+    pub fn acquire(&self) -> PipelineSlot<'_> {
+        let mut available = self.available.lock().unwrap_or_else(|e| e.into_inner());
+        while *available == 0 {
+            available = self
+                .released
+                .wait(available)
+                .unwrap_or_else(|e| e.into_inner());
+        }
+        *available -= 1;
+        PipelineSlot { slots: self }
+    }
+}
+
+pub struct PipelineSlot<'a> {
+    slots: &'a PipelineSlots,
+}
+
+impl Drop for PipelineSlot<'_> {
+    fn drop(&mut self) {
+        let mut available = self.slots.available.lock().unwrap_or_else(|e| e.into_inner());
+        *available += 1;
+        self.slots.released.notify_one();
+    }
+}
+
 pub fn process_queue_item(
     app_handle: AppHandle,
     state: ProcessingState,
@@ -896,6 +1285,7 @@ pub fn process_queue_item(
     dv_delay_ms: f64,
     hdr10plus_delay_ms: f64,
     keep_temp_files: bool,
+    slots: Arc<PipelineSlots>,
 ) -> Result<(), String> {
     emit_log(
         &app_handle,
@@ -908,30 +1298,14 @@ pub fn process_queue_item(
 
     if hdr_path.is_dir() && dv_path.is_dir() {
         let hdr10plus_dir = hdr10plus_path.as_ref().filter(|path| path.is_dir());
-        let mut hdr10plus_files: Vec<String> = if let Some(dir) = hdr10plus_dir {
-            fs::read_dir(dir)
-                .map_err(|e| e.to_string())?
-                .filter_map(|entry| entry.ok())
-                .filter_map(|entry| entry.file_name().into_string().ok())
-                .collect()
+        let hdr10plus_files: Vec<String> = if let Some(dir) = hdr10plus_dir {
+            list_file_names(dir)?
         } else {
             Vec::new()
         };
-        let mut hdr_files = fs::read_dir(&hdr_path)
-            .map_err(|e| e.to_string())?
-            .filter_map(|entry| entry.ok())
-            .filter_map(|entry| entry.file_name().into_string().ok())
-            .collect::<Vec<String>>();
-
-        let mut dv_files = fs::read_dir(&dv_path)
-            .map_err(|e| e.to_string())?
-            .filter_map(|entry| entry.ok())
-            .filter_map(|entry| entry.file_name().into_string().ok())
-            .collect::<Vec<String>>();
-
-        hdr_files.sort();
-        dv_files.sort();
-        hdr10plus_files.sort();
+        let hdr_files = list_file_names(&hdr_path)?;
+        let dv_files = list_file_names(&dv_path)?;
+        let dv_by_base = index_dv_files_by_base(&app_handle, &dv_files);
 
         emit_log(
             &app_handle,
@@ -960,13 +1334,12 @@ pub fn process_queue_item(
 
         let mut tasks = Vec::new();
         for (index, hdr_file) in hdr_files.iter().enumerate() {
-            let base_regex = Regex::new(r"(.*)\.(HDR)+.*").map_err(|e| e.to_string())?;
-            let base = base_regex
-                .captures(hdr_file)
-                .and_then(|c| c.get(1).map(|m| m.as_str()))
-                .unwrap_or_else(|| hdr_file.split('.').next().unwrap_or(hdr_file));
+            let base = hdr_file_base(hdr_file);
 
-            let dv_file = find_matching_dv_file(&dv_files, base)
+            let dv_file = dv_by_base
+                .get(base)
+                .map(|name| name.to_string())
+                .or_else(|| find_matching_dv_file(&dv_files, base))
                 .or_else(|| dv_files.get(index).cloned())
                 .ok_or_else(|| format!("No DV file available for {}", hdr_file))?;
 
@@ -997,7 +1370,7 @@ pub fn process_queue_item(
             ));
         }
 
-        let worker_count = total_files;
+        let worker_count = slots.capacity().min(total_files);
         let task_queue = Arc::new(Mutex::new(std::collections::VecDeque::from(tasks)));
         let tracker = Arc::new(Mutex::new(vec![0u8; total_files]));
         let active_workers = Arc::new(Mutex::new(0usize));
@@ -1015,8 +1388,11 @@ pub fn process_queue_item(
             let tool_paths = tool_paths.clone();
             let queue_id = queue_id.clone();
             let hdr10plus_path = hdr10plus_path.clone();
+            let slots = Arc::clone(&slots);
 
             let handle = thread::spawn(move || loop {
+                let _slot = slots.acquire();
+
                 if let Ok(flag) = state.cancel_flag.lock() {
                     if *flag {
                         break;
@@ -1106,6 +1482,7 @@ pub fn process_queue_item(
             normalize_output_path(&tool_paths.default_output, &item.output_path)
         };
 
+        let _slot = slots.acquire();
         run_pipeline(
             &app_handle,
             &state,
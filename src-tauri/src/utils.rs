@@ -1,5 +1,9 @@
+use std::collections::HashMap;
+use std::fs;
 use std::path::{Path, PathBuf};
+use std::sync::OnceLock;
 use regex::Regex;
+use serde::Deserialize;
 use tauri::{AppHandle, Manager};
 use crate::models::{LogPayload, StepPayload, QueuePayload, FilePayload, StatusPayload};
 
@@ -59,6 +63,20 @@ pub fn resolve_path(app: &AppHandle, path: &str) -> PathBuf {
     path_buf
 }
 
+fn hdr_base_regex() -> &'static Regex {
+    static HDR_BASE_RE: OnceLock<Regex> = OnceLock::new();
+    HDR_BASE_RE.get_or_init(|| Regex::new(r"(.*)\.(HDR)+.*").expect("valid HDR base regex"))
+}
+
+/// Strip the `.HDR...` suffix from a source file name, falling back to the
+/// part before the first dot.
+pub fn hdr_file_base(file_name: &str) -> &str {
+    hdr_base_regex()
+        .captures(file_name)
+        .and_then(|c| c.get(1).map(|m| m.as_str()))
+        .unwrap_or_else(|| file_name.split('.').next().unwrap_or(file_name))
+}
+
 pub fn normalize_output_path(default_output: &str, output_path: &str) -> PathBuf {
     let candidate = PathBuf::from(output_path);
     if output_path.is_empty() {
@@ -79,10 +97,7 @@ pub fn compute_output_for_single(
         .file_name()
         .and_then(|s| s.to_str())
         .unwrap_or("output");
-    let regex = Regex::new(r"(.*)\.(HDR)+.*").ok();
-    let base = regex
-        .and_then(|re| re.captures(filename).and_then(|c| c.get(1).map(|m| m.as_str())))
-        .unwrap_or_else(|| filename.split('.').next().unwrap_or("output"));
+    let base = hdr_file_base(filename);
     let default_filename = format!("{}.DV.HDR.H.265-NOGRP.mkv", base);
 
     if !output_path.is_empty() {
@@ -96,18 +111,77 @@ pub fn compute_output_for_single(
 }
 
 pub fn compute_output_for_batch(default_output: &str, hdr_file: &str) -> PathBuf {
-    let regex = Regex::new(r"(.*)\.(HDR)+.*").ok();
-    let base = regex
-        .and_then(|re| re.captures(hdr_file).and_then(|c| c.get(1).map(|m| m.as_str())))
-        .unwrap_or_else(|| hdr_file.split('.').next().unwrap_or(hdr_file));
+    let base = hdr_file_base(hdr_file);
     let filename = format!("{}.DV.HDR.H.265-NOGRP.mkv", base);
     Path::new(default_output).join(filename)
 }
 
 
+/// List the names of the non-directory entries in `dir`, sorted. Subdirectories are
+/// skipped using the type reported by the directory scan itself.
+pub fn list_file_names(dir: &Path) -> Result<Vec<String>, String> {
+    let mut names = fs::read_dir(dir)
+        .map_err(|e| e.to_string())?
+        .filter_map(|entry| entry.ok())
+        .filter(|entry| entry.file_type().map(|t| !t.is_dir()).unwrap_or(false))
+        .filter_map(|entry| entry.file_name().into_string().ok())
+        .collect::<Vec<String>>();
+    names.sort();
+    Ok(names)
+}
+
+/// Index DV file names by the part before the last `.DV`, so each HDR file
+/// can be paired with a hash lookup instead of scanning every DV name.
+///
+/// If two files share a base, the first (in sorted order) is kept and a
+/// warning is logged naming the one that was left out.
+pub fn index_dv_files_by_base<'a>(app: &AppHandle, dv_files: &'a [String]) -> HashMap<&'a str, &'a String> {
+    let mut index: HashMap<&str, &String> = HashMap::with_capacity(dv_files.len());
+    for name in dv_files {
+        let Some(pos) = name.rfind(".DV") else {
+            continue;
+        };
+        let base = &name[..pos];
+        if let Some(existing) = index.get(base) {
+            emit_log(
+                app,
+                "warning",
+                format!(
+                    "DV files {} and {} share the base name '{}'; using {}",
+                    existing, name, base, existing
+                ),
+            );
+        } else {
+            index.insert(base, name);
+        }
+    }
+    index
+}
+
 pub fn find_matching_dv_file(dv_files: &[String], base: &str) -> Option<String> {
-    let re = Regex::new(base).ok()?;
-    dv_files.iter().find(|f| re.is_match(f)).cloned()
+    dv_files.iter().find(|f| f.contains(base)).cloned()
+}
+
+/// The subset of `mkvmerge -J` output we read. Everything else in the
+/// identification report (container info, attachments, chapters, other
+/// track properties) is skipped by serde instead of being built into a Value tree.
+#[derive(Debug, Deserialize)]
+struct MkvIdentification {
+    #[serde(default)]
+    tracks: Vec<MkvTrack>,
+}
+
+#[derive(Debug, Deserialize)]
+struct MkvTrack {
+    #[serde(rename = "type", default)]
+    track_type: String,
+    #[serde(default)]
+    properties: MkvTrackProperties,
+}
+
+#[derive(Debug, Default, Deserialize)]
+struct MkvTrackProperties {
+    default_duration: Option<serde_json::Value>,
 }
 
 pub fn get_video_metadata(tool_path: &Path, file_path: &Path) -> Result<String, String> {
@@ -128,24 +202,25 @@ pub fn get_video_metadata(tool_path: &Path, file_path: &Path) -> Result<String,
         return Err("mkvmerge identification failed".to_string());
     }
 
-    let json: serde_json::Value = serde_json::from_slice(&output.stdout)
+    let identification: MkvIdentification = serde_json::from_slice(&output.stdout)
         .map_err(|e| format!("Failed to parse JSON: {}", e))?;
 
-    let tracks = json["tracks"]
-        .as_array()
-        .ok_or("No tracks found in JSON output")?;
+    let tracks = identification.tracks;
+    if tracks.is_empty() {
+        return Err("No tracks found in JSON output".to_string());
+    }
+
+    for track in &tracks {
+        if track.track_type == "video" {
+            let duration = track.properties.default_duration.as_ref();
 
-    for track in tracks {
-        if track["type"] == "video" {
-            let props = &track["properties"];
-            
             // Try string format (e.g., "23.976fps")
-            if let Some(duration) = props["default_duration"].as_str() {
+            if let Some(duration) = duration.and_then(|d| d.as_str()) {
                 return Ok(duration.to_string());
             }
             
             // Try numeric format (nanoseconds)
-            if let Some(duration_ns) = props["default_duration"].as_u64() {
+            if let Some(duration_ns) = duration.and_then(|d| d.as_u64()) {
                 return Ok(format!("{}ns", duration_ns));
             }
 